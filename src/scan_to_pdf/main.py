@@ -1,29 +1,112 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
 import io
-from collections.abc import Iterable
+import itertools
+import math
+import operator
+import os
+import shutil
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any
 
 import pytesseract
-from PIL import Image, ImageOps
-from pypdf import PdfReader, PdfWriter
+from PIL import Image, ImageOps, features
+from pypdf import PageObject, PasswordType, PdfReader, PdfWriter
 from tqdm import tqdm
 
-IMAGE_EXTENSIONS = {
-    ".png",
-    ".jpg",
-    ".jpeg",
-    ".tif",
-    ".tiff",
-    ".bmp",
-    ".gif",
-    ".webp",
-}
+try:
+    # Optional: keeps the Tesseract engine and language data loaded in-process
+    # instead of spawning a ``tesseract`` subprocess for every image.
+    import tesserocr
+except ImportError:
+    tesserocr = None  # type: ignore[assignment]
+
+try:
+    # Optional: merges and writes PDFs with QPDF (C++) instead of pure Python.
+    import pikepdf
+except ImportError:
+    pikepdf = None  # type: ignore[assignment]
+
+IMAGE_EXTENSIONS: frozenset[str] = frozenset(
+    {
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".tif",
+        ".tiff",
+        ".bmp",
+        ".gif",
+        ".webp",
+    }
+)
+
+JPEG_EXTENSIONS: frozenset[str] = frozenset({".jpg", ".jpeg"})
+
+# Image formats and modes Tesseract (Leptonica) reads directly from a file
+# and embeds in its PDF without loss. Leptonica copies PNG and JPEG data
+# as-is and stores 1-bit TIFF as CCITT G4, but re-encodes other TIFF and
+# BMP images as JPEG, so those go through Pillow instead.
+NATIVE_IMAGE_EXTENSIONS: frozenset[str] = frozenset({".png", ".jpg", ".jpeg"})
+TIFF_EXTENSIONS: frozenset[str] = frozenset({".tif", ".tiff"})
+NATIVE_IMAGE_MODES: frozenset[str] = frozenset({"1", "L", "RGB"})
+GRAYSCALE_IMAGE_MODES: frozenset[str] = frozenset({"1", "L"})
+BITONAL_IMAGE_MODES: frozenset[str] = frozenset({"1"})
+
+# A grayscale image counts as black and white when more than this share of
+# its pixels lies within BITONAL_LEVEL_MARGIN levels of pure black or white.
+BITONAL_MIN_RATIO = 0.9
+BITONAL_LEVEL_MARGIN = 32
+
+EXIF_ORIENTATION_TAG = 0x0112
 
 PDF_EXTENSION = ".pdf"
 
-SUPPORTED_EXTENSIONS = IMAGE_EXTENSIONS | {PDF_EXTENSION}
+# Minimum ratio of pages with extractable text for a PDF to count as searchable
+DEFAULT_TEXT_LAYER_THRESHOLD = 0.1
+
+SUPPORTED_EXTENSIONS: frozenset[str] = IMAGE_EXTENSIONS | {PDF_EXTENSION}
+
+# Folders with at least this many files are stat'ed from a thread pool.
+STAT_POOL_MIN_FILES = 64
+STAT_POOL_WORKERS = 32
+
+# Longest image side passed to Tesseract; larger scans are downscaled first.
+DEFAULT_MAX_DIM = 3500
+
+# Above this downscale factor BOX resampling is used instead of LANCZOS. It is
+# much faster and still antialiases well enough for text.
+BOX_RESAMPLE_MIN_FACTOR = 4
+
+# Most images OCRed together in one Tesseract run (see images_to_pdf_bytes_batch)
+OCR_BATCH_MAX_IMAGES = 16
+
+# Kinds of units planned for merging (see _plan_merge_units)
+PDF_UNIT = "pdf"
+IMAGE_UNIT = "image"  # A single image preprocessed with Pillow before OCR
+DIRECT_IMAGE_UNIT = "direct"  # Images Tesseract reads as-is, possibly batched
+
+# Write buffer size for the output PDF
+OUTPUT_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Environment variable limiting how many images are OCRed in parallel.
+OCR_CONCURRENCY_ENV = "OCR_CONCURRENCY"
+
+# Environment variable selecting the OCR backend.
+OCR_BACKEND_ENV = "OCR_BACKEND"
+TESSEROCR_BACKEND = "tesserocr"
+PYTESSERACT_BACKEND = "pytesseract"
+OCR_BACKENDS = (TESSEROCR_BACKEND, PYTESSERACT_BACKEND)
 
 
 def get_creation_timestamp(path: Path) -> float:
@@ -35,7 +118,18 @@ def get_creation_timestamp(path: Path) -> float:
     Returns:
         Creation timestamp (or modification time if creation time unavailable).
     """
-    stats = path.stat()
+    return _timestamp_from_stat(path.stat())
+
+
+def _timestamp_from_stat(stats: os.stat_result) -> float:
+    """Return the creation time from stat results, or modification time.
+
+    Args:
+        stats: Result of a stat call.
+
+    Returns:
+        Creation timestamp (or modification time if creation time unavailable).
+    """
     return getattr(stats, "st_birthtime", stats.st_mtime)
 
 
@@ -59,19 +153,82 @@ def collect_files(folder: Path) -> list[Path]:
     if not folder.is_dir():
         raise NotADirectoryError(f"Path is not a directory: {folder}")
 
-    files = [
-        path
-        for path in folder.iterdir()
-        if path.is_file() and path.suffix.lower() in SUPPORTED_EXTENSIONS
-    ]
-    return sorted(files, key=get_creation_timestamp)
+    # scandir reports the file type from the directory listing, so only the
+    # supported files need a stat call for their timestamp. Names used in the
+    # per-entry loop are bound to locals to skip global lookups.
+    supported = SUPPORTED_EXTENSIONS
+    splitext = os.path.splitext
+    with os.scandir(folder) as entries:
+        files = [
+            entry
+            for entry in entries
+            if splitext(entry.name)[1].lower() in supported and entry.is_file()
+        ]
+
+    # Timestamps are computed once per file rather than by the sort. stat()
+    # releases the GIL, so on large or network folders the calls are issued
+    # from a thread pool to overlap their latency.
+    if len(files) < STAT_POOL_MIN_FILES:
+        timestamped = [_entry_with_timestamp(entry) for entry in files]
+    else:
+        with ThreadPoolExecutor(max_workers=STAT_POOL_WORKERS) as executor:
+            timestamped = list(executor.map(_entry_with_timestamp, files))
+
+    # Sort on the timestamp alone: Timsort then compares plain floats, and
+    # files with equal timestamps keep their directory order.
+    timestamped.sort(key=operator.itemgetter(0))
+    return [path for _, path in timestamped]
+
+
+def _entry_with_timestamp(entry: os.DirEntry[str]) -> tuple[float, Path]:
+    """Stat a directory entry and pair it with its creation timestamp.
+
+    Args:
+        entry: Directory entry returned by ``os.scandir``.
+
+    Returns:
+        Tuple of the entry's timestamp and its path.
+    """
+    return _timestamp_from_stat(entry.stat()), Path(entry.path)
+
+
+def _page_may_have_text(page: PageObject) -> bool:
+    """Cheaply check whether a page could contain text.
+
+    Text can only be drawn with a font, either directly on the page or inside
+    a form XObject. Scanned pages only reference image XObjects, so they are
+    ruled out without parsing the content stream.
+
+    Args:
+        page: PDF page to inspect.
+
+    Returns:
+        True if the page references fonts or form XObjects, False otherwise.
+    """
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if "/Font" in resources:
+        return True
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+    return any(
+        xobject.get_object().get("/Subtype") == "/Form"
+        for xobject in xobjects.get_object().values()
+    )
 
 
-def has_text_layer(pdf_path: Path, threshold: float = 0.1) -> bool:
+def has_text_layer(
+    pdf_path: Path, threshold: float = DEFAULT_TEXT_LAYER_THRESHOLD
+) -> bool:
     """Check if a PDF has a text layer (is OCR'd or text-based).
 
-    This function extracts text from each page and determines if at least
-    a certain percentage of pages contain extractable text.
+    This function extracts text from pages and determines if at least a
+    certain percentage of pages contain extractable text. Text extraction is
+    expensive, so pages without fonts are skipped and scanning stops as soon
+    as the result is known.
 
     Args:
         pdf_path: Path to the PDF file.
@@ -88,88 +245,826 @@ def has_text_layer(pdf_path: Path, threshold: float = 0.1) -> bool:
     if not pdf_path.exists():
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
-    reader = PdfReader(pdf_path)
-    total_pages = len(reader.pages)
+    with PdfReader(pdf_path) as reader:
+        return _reader_has_text_layer(reader, threshold)
+
+
+def _reader_has_text_layer(reader: PdfReader, threshold: float) -> bool:
+    """Check if an already opened PDF has a text layer.
+
+    See ``has_text_layer`` for the meaning of ``threshold``.
+
+    Args:
+        reader: Opened PDF.
+        threshold: Minimum ratio of pages with text.
+
+    Returns:
+        True if the PDF appears to have a text layer, False otherwise.
+        Encrypted PDFs that cannot be opened without a password are treated
+        as having no text layer.
+    """
+    if _needs_password(reader):
+        return False
+
+    return _pages_meet_threshold(reader.pages, _page_has_text, threshold)
+
+
+def _needs_password(reader: PdfReader) -> bool:
+    """Check if an opened PDF is encrypted with a non-empty user password.
+
+    Args:
+        reader: Opened PDF.
+
+    Returns:
+        True if the PDF cannot be read without a password, False otherwise.
+    """
+    # pypdf already tried the empty user password when opening the file
+    return reader.is_encrypted and reader.decrypt("") == PasswordType.NOT_DECRYPTED
+
+
+def _page_has_text(page: PageObject) -> bool:
+    """Check whether a page has extractable text.
+
+    Args:
+        page: PDF page to inspect.
+
+    Returns:
+        True if text can be extracted from the page, False otherwise.
+    """
+    return _page_may_have_text(page) and bool(page.extract_text().strip())
+
+
+def _pages_meet_threshold(
+    pages: Sequence[Any], page_has_text: Callable[[Any], bool], threshold: float
+) -> bool:
+    """Check if at least ``threshold`` of the pages have text.
+
+    Pages are checked in order, and checking stops as soon as the result is
+    known, so the remaining pages are never inspected.
+
+    Args:
+        pages: Pages of an opened PDF.
+        page_has_text: Returns whether a single page has text.
+        threshold: Minimum ratio of pages with text.
+
+    Returns:
+        True if the ratio of pages with text reaches ``threshold``, False
+        otherwise or if there are no pages.
+    """
+    total_pages = len(pages)
 
     if total_pages == 0:
         return False
 
     pages_with_text = 0
-    for page in reader.pages:
-        text = page.extract_text().strip()
-        if text:  # Page has extractable text
+    for index, page in enumerate(pages):
+        if (pages_with_text / total_pages) >= threshold:
+            break
+        if (pages_with_text + total_pages - index) / total_pages < threshold:
+            break  # Too few pages left to reach the threshold
+        if page_has_text(page):
             pages_with_text += 1
 
     # Return True if at least threshold% of pages have text
     return (pages_with_text / total_pages) >= threshold
 
 
-def image_to_pdf_bytes(image_path: Path, language: str) -> bytes:
+def get_ocr_backend() -> str:
+    """Return the OCR backend to use for images.
+
+    The value is read from the ``OCR_BACKEND`` environment variable. When
+    unset, ``tesserocr`` is used if it is installed, otherwise ``pytesseract``.
+
+    Returns:
+        Either ``"tesserocr"`` or ``"pytesseract"``.
+
+    Raises:
+        ValueError: If the backend is unknown, or ``tesserocr`` is requested
+            but not installed.
+    """
+    backend = os.environ.get(OCR_BACKEND_ENV, "").strip().lower()
+    if not backend:
+        return PYTESSERACT_BACKEND if tesserocr is None else TESSEROCR_BACKEND
+    if backend not in OCR_BACKENDS:
+        raise ValueError(
+            f"{OCR_BACKEND_ENV} must be one of {', '.join(OCR_BACKENDS)}, "
+            f"got: {backend!r}"
+        )
+    if backend == TESSEROCR_BACKEND and tesserocr is None:
+        raise ValueError(
+            f"{OCR_BACKEND_ENV}={TESSEROCR_BACKEND} requires the tesserocr "
+            "package. Install it with: pip install 'scan-to-pdf[tesserocr]'"
+        )
+    return backend
+
+
+@functools.cache
+def _get_api(language: str) -> Any:
+    """Return a cached tesserocr API configured to render PDFs.
+
+    The engine is created once per process and language, so the traineddata
+    files are parsed only on first use.
+
+    Args:
+        language: Tesseract language codes (e.g., 'jpn+eng').
+
+    Returns:
+        A ``tesserocr.PyTessBaseAPI`` instance.
+    """
+    api = tesserocr.PyTessBaseAPI(lang=language)
+    api.SetVariable("tessedit_create_pdf", "true")
+    return api
+
+
+def _tesserocr_pdf_bytes(image_file: Path, language: str) -> bytes:
+    """OCR an image file with the in-process tesserocr engine.
+
+    tesserocr only exposes Tesseract's PDF renderer through ``ProcessPages``,
+    which reads the image from a file and writes ``<outputbase>.pdf``.
+
+    Args:
+        image_file: Path to an image file Tesseract can read.
+        language: Tesseract language codes (e.g., 'jpn+eng').
+
+    Returns:
+        PDF data as bytes.
+
+    Raises:
+        RuntimeError: If Tesseract fails to produce a PDF.
+    """
+    api = _get_api(language)
+    with TemporaryDirectory() as tmpdir:
+        output_base = Path(tmpdir) / "page"
+        if not api.ProcessPages(str(output_base), str(image_file)):
+            raise RuntimeError(f"Tesseract failed to OCR image: {image_file}")
+        return output_base.with_suffix(PDF_EXTENSION).read_bytes()
+
+
+def _ocr_to_pdf_bytes(source: Path | Image.Image, language: str) -> bytes:
+    """Run OCR on an image file or a decoded image with the selected backend.
+
+    Args:
+        source: Path to an image file Tesseract can read, or a PIL image.
+        language: Tesseract language codes (e.g., 'jpn+eng').
+
+    Returns:
+        PDF data as bytes.
+    """
+    if isinstance(source, Image.Image):
+        # Both backends read images from a file, and Tesseract embeds that
+        # file's image in the PDF. Leptonica keeps PNG lossless (Flate) but
+        # re-encodes 8-bit TIFF as JPEG, so only 1-bit images, which become
+        # lossless CCITT G4, are written as uncompressed TIFF. PNG data is
+        # copied into the PDF as-is, so it keeps Pillow's default compression
+        # level: a faster level would make the output PDF larger.
+        with TemporaryDirectory() as tmpdir:
+            dpi = source.info.get("dpi")
+            options: dict[str, Any] = {"dpi": dpi} if dpi else {}
+            if source.mode == "1":
+                image_file = Path(tmpdir) / "page.tif"
+                source.save(image_file, format="TIFF", compression="raw", **options)
+            else:
+                image_file = Path(tmpdir) / "page.png"
+                source.save(image_file, format="PNG", **options)
+            return _ocr_to_pdf_bytes(image_file, language)
+
+    if get_ocr_backend() == TESSEROCR_BACKEND:
+        return _tesserocr_pdf_bytes(source, language)
+
+    pdf_data = pytesseract.image_to_pdf_or_hocr(
+        str(source), extension="pdf", lang=language
+    )
+    if isinstance(pdf_data, str):
+        return pdf_data.encode("utf-8")
+    return pdf_data
+
+
+def _can_ocr_directly(
+    image: Image.Image, suffix: str, max_dim: int, grayscale: bool
+) -> bool:
+    """Check if Tesseract can read an image file as-is.
+
+    Tesseract loads these formats itself through Leptonica. Handing it the
+    file path skips decoding with Pillow and re-encoding a temporary PNG.
+    Only files that Leptonica embeds in the PDF losslessly qualify: PNG,
+    JPEG and 1-bit TIFF. Only the header of ``image`` is read by this check.
+
+    Args:
+        image: Lazily opened image.
+        suffix: Lowercase file extension of the image.
+        max_dim: Images larger than this must be downscaled with Pillow.
+        grayscale: Whether color images must be converted to grayscale.
+
+    Returns:
+        True if the file needs no rotation, downscaling or conversion.
+    """
+    if suffix in NATIVE_IMAGE_EXTENSIONS:
+        modes = GRAYSCALE_IMAGE_MODES if grayscale else NATIVE_IMAGE_MODES
+    elif suffix in TIFF_EXTENSIONS:
+        modes = BITONAL_IMAGE_MODES
+    else:
+        return False
+    return (
+        image.mode in modes
+        and getattr(image, "n_frames", 1) == 1
+        and max(image.size) <= max_dim
+        and _exif_orientation(image) == 1
+    )
+
+
+def _exif_orientation(image: Image.Image) -> int:
+    """Return the EXIF orientation of an image without decoding its pixels.
+
+    ``PngImageFile.getexif`` loads the whole image when no eXIf chunk was
+    seen before the pixel data, so for PNG only the EXIF read with the header
+    is used. Other formats keep their EXIF in the header.
+
+    Args:
+        image: Lazily opened image.
+
+    Returns:
+        The orientation tag value, or 1 (upright) if there is none.
+    """
+    if image.format == "PNG":
+        exif = Image.Exif()
+        raw_exif = image.info.get("exif")
+        if raw_exif:
+            exif.load(raw_exif)
+        return exif.get(EXIF_ORIENTATION_TAG, 1)
+    return image.getexif().get(EXIF_ORIENTATION_TAG, 1)
+
+
+def _downscale(image: Image.Image, max_dim: int) -> Image.Image:
+    """Shrink an image in place so its longest side is at most ``max_dim``.
+
+    Tesseract's work grows with pixel count while its accuracy does not
+    improve beyond roughly 300 DPI, so oversized scans are downscaled. The
+    DPI metadata is scaled too, keeping the physical page size unchanged.
+
+    Args:
+        image: Image to shrink.
+        max_dim: Maximum length of the longest side in pixels.
+
+    Returns:
+        The same image object, resized if it was larger than ``max_dim``.
+    """
+    longest_side = max(image.size)
+    if longest_side <= max_dim:
+        return image
+
+    factor = longest_side / max_dim
+    resample = (
+        Image.Resampling.BOX
+        if factor > BOX_RESAMPLE_MIN_FACTOR
+        else Image.Resampling.LANCZOS
+    )
+    image.thumbnail((max_dim, max_dim), resample)
+    _scale_dpi(image, factor)
+    return image
+
+
+def _draft_jpeg(image: Image.Image, max_dim: int, grayscale: bool) -> None:
+    """Let libjpeg shrink and gray an oversized JPEG while decoding it.
+
+    libjpeg can decode at 1/2, 1/4 or 1/8 scale directly from the DCT
+    coefficients, which is much cheaper than decoding at full size and
+    resampling afterwards. The largest such scale that still keeps the image
+    at least ``max_dim`` pixels long is chosen; ``_downscale`` does the rest.
+    For grayscale output only the luma channel is decoded. Must be called
+    before the image is loaded.
+
+    Args:
+        image: Lazily opened image; ignored unless it is a JPEG.
+        max_dim: Target length of the longest side in pixels.
+        grayscale: Whether to decode straight to 8-bit grayscale.
+    """
+    if image.format != "JPEG":
+        return
+
+    width, height = image.size
+    longest_side = max(width, height)
+    size = None
+    if longest_side > max_dim:
+        ratio = max_dim / longest_side
+        size = (math.ceil(width * ratio), math.ceil(height * ratio))
+    if size is None and not grayscale:
+        return
+
+    image.draft("L" if grayscale else None, size)
+    _scale_dpi(image, width / image.size[0])
+
+
+def _to_ocr_mode(image: Image.Image, grayscale: bool) -> Image.Image:
+    """Convert an image to the pixel format handed to Tesseract.
+
+    Tesseract binarizes its input anyway, so grayscale input saves it work on
+    two thirds of the data, and 1-bit input skips thresholding entirely.
+    Because Tesseract embeds this image in the output PDF, color is only
+    dropped when ``grayscale`` is requested.
+
+    Args:
+        image: Decoded image.
+        grayscale: Whether to reduce the image to grayscale, or to 1-bit for
+            scans that are already black and white.
+
+    Returns:
+        The image in RGB, L or 1 mode.
+    """
+    if not grayscale:
+        return image.convert("RGB")
+    if image.mode == "1":
+        return image
+
+    gray = image.convert("L")
+    histogram = gray.histogram()
+    margin = BITONAL_LEVEL_MARGIN
+    extremes = sum(histogram[:margin]) + sum(histogram[-margin:])
+    if extremes / (gray.width * gray.height) > BITONAL_MIN_RATIO:
+        return gray.convert("1", dither=Image.Dither.NONE)
+    return gray
+
+
+def _scale_dpi(image: Image.Image, factor: float) -> None:
+    """Divide the image's DPI metadata after shrinking it by ``factor``.
+
+    Args:
+        image: Image whose ``info["dpi"]`` is updated, if present.
+        factor: Ratio of the original size to the new size.
+    """
+    dpi = image.info.get("dpi")
+    if dpi:
+        image.info["dpi"] = tuple(value / factor for value in dpi)
+
+
+def image_to_pdf_bytes(
+    image_path: Path,
+    language: str,
+    max_dim: int = DEFAULT_MAX_DIM,
+    grayscale: bool = False,
+) -> bytes:
     """Convert a single image to searchable PDF bytes using Tesseract OCR.
 
+    Uses the in-process tesserocr engine when available (see
+    ``get_ocr_backend``) and falls back to the pytesseract subprocess.
+    Upright images in formats Tesseract reads natively are passed by path;
+    others are rotated, downscaled and converted with Pillow first.
+
     Args:
         image_path: Path to the image file.
         language: Tesseract language codes (e.g., 'jpn+eng').
+        max_dim: Images whose longest side exceeds this many pixels are
+            downscaled before OCR.
+        grayscale: Convert images to grayscale (or 1-bit for black and white
+            scans) before OCR. The output page is then not in color.
 
     Returns:
         PDF data as bytes.
     """
     with Image.open(image_path) as img:
-        processed = ImageOps.exif_transpose(img).convert("RGB")
-        pdf_data = pytesseract.image_to_pdf_or_hocr(
-            processed, extension="pdf", lang=language
+        if _can_ocr_directly(img, image_path.suffix.lower(), max_dim, grayscale):
+            return _ocr_to_pdf_bytes(image_path, language)
+        _draft_jpeg(img, max_dim, grayscale)
+        transposed = _downscale(ImageOps.exif_transpose(img), max_dim)
+        processed = _to_ocr_mode(transposed, grayscale)
+        return _ocr_to_pdf_bytes(processed, language)
+
+
+def images_to_pdf_bytes_batch(image_paths: Sequence[Path], language: str) -> bytes:
+    """Convert several images to one searchable PDF in a single Tesseract run.
+
+    Tesseract accepts a text file listing image paths and renders them all
+    into one multi-page PDF, so the engine and language data are set up once
+    for the whole batch instead of once per image. The images are read by
+    Tesseract as-is, so they must not need rotation, downscaling or
+    conversion (see ``image_to_pdf_bytes``).
+
+    Args:
+        image_paths: Paths to the image files, in page order.
+        language: Tesseract language codes (e.g., 'jpn+eng').
+
+    Returns:
+        PDF data as bytes, with one page per image.
+    """
+    with TemporaryDirectory() as tmpdir:
+        list_file = Path(tmpdir) / "images.txt"
+        list_file.write_text(
+            "".join(f"{path.resolve()}\n" for path in image_paths), encoding="utf-8"
         )
-    if isinstance(pdf_data, str):
-        return pdf_data.encode("utf-8")
-    return pdf_data
+        return _ocr_to_pdf_bytes(list_file, language)
+
+
+def _unit_kind(path: Path, suffix: str, max_dim: int, grayscale: bool) -> str:
+    """Classify a supported input for merge planning.
+
+    Args:
+        path: Path to the input file.
+        suffix: Lowercase file extension of ``path``.
+        max_dim: Maximum longest image side in pixels before OCR.
+        grayscale: Whether images are converted to grayscale before OCR.
+
+    Returns:
+        ``PDF_UNIT``, ``DIRECT_IMAGE_UNIT`` or ``IMAGE_UNIT``.
+    """
+    if suffix == PDF_EXTENSION:
+        return PDF_UNIT
+    if _is_batchable(path, suffix, max_dim, grayscale):
+        return DIRECT_IMAGE_UNIT
+    return IMAGE_UNIT
+
+
+def _is_batchable(path: Path, suffix: str, max_dim: int, grayscale: bool) -> bool:
+    """Check if an input is an image Tesseract can OCR as-is in a batch.
+
+    Args:
+        path: Path to the input file.
+        suffix: Lowercase file extension of ``path``.
+        max_dim: Maximum longest image side in pixels before OCR.
+        grayscale: Whether images are converted to grayscale before OCR.
+
+    Returns:
+        True if the image can be part of a Tesseract batch, False otherwise.
+    """
+    if suffix not in IMAGE_EXTENSIONS:
+        return False
+    try:
+        with Image.open(path) as img:
+            return _can_ocr_directly(img, suffix, max_dim, grayscale)
+    except OSError:
+        # Unreadable images are OCRed alone so their error surfaces as before
+        return False
+
+
+def has_libjpeg_turbo() -> bool:
+    """Check if Pillow decodes JPEGs with libjpeg-turbo.
+
+    libjpeg-turbo's SIMD decoder is several times faster than plain libjpeg,
+    which matters for large JPEG scans.
+
+    Returns:
+        True if Pillow was built against libjpeg-turbo, False otherwise.
+    """
+    return features.version("libjpeg_turbo") is not None
+
+
+def get_ocr_concurrency() -> int:
+    """Return the number of images to OCR concurrently.
+
+    The value is read from the ``OCR_CONCURRENCY`` environment variable and
+    defaults to the number of CPUs when unset.
+
+    Returns:
+        Number of concurrent OCR workers (at least 1).
+
+    Raises:
+        ValueError: If ``OCR_CONCURRENCY`` is not a positive integer.
+    """
+    raw_value = os.environ.get(OCR_CONCURRENCY_ENV)
+    if raw_value is None or not raw_value.strip():
+        return os.cpu_count() or 1
+    try:
+        concurrency = int(raw_value)
+    except ValueError as e:
+        raise ValueError(
+            f"{OCR_CONCURRENCY_ENV} must be a positive integer, got: {raw_value!r}"
+        ) from e
+    if concurrency < 1:
+        raise ValueError(
+            f"{OCR_CONCURRENCY_ENV} must be a positive integer, got: {raw_value!r}"
+        )
+    return concurrency
+
+
+def _create_ocr_executor(workers: int) -> Executor:
+    """Create the executor that runs OCR for the selected backend.
+
+    pytesseract spends nearly all its time waiting on a ``tesseract``
+    subprocess, so threads are enough and avoid process start-up and pickling
+    overhead. tesserocr runs the engine in-process and its cached API
+    is not thread-safe, so it gets one engine per worker process.
+
+    Args:
+        workers: Maximum number of concurrent OCR jobs.
+
+    Returns:
+        A thread or process pool executor.
+    """
+    if get_ocr_backend() == TESSEROCR_BACKEND:
+        return ProcessPoolExecutor(max_workers=workers)
+    return ThreadPoolExecutor(max_workers=workers)
+
+
+def _warn_no_text_layer(pdf_path: Path) -> None:
+    """Print a warning that a PDF is merged without a text layer.
+
+    Args:
+        pdf_path: Path to the PDF file.
+    """
+    print(f"Warning: {pdf_path.name} has no text layer. Adding as-is without OCR.")
+
+
+def _warn_password_protected(pdf_path: Path) -> None:
+    """Print a warning that a PDF needing a password is left out.
+
+    Args:
+        pdf_path: Path to the PDF file.
+    """
+    print(f"Warning: {pdf_path.name} is password-protected. Skipping.")
+
+
+def _plan_merge_units(
+    file_list: list[Path],
+    suffixes: list[str],
+    max_dim: int,
+    grayscale: bool,
+    workers: int,
+) -> list[tuple[list[Path], str]]:
+    """Split the inputs into units that each become one merged PDF.
+
+    Runs of consecutive images that Tesseract can read as-is are batched so
+    each batch needs a single Tesseract run. Runs are split evenly across
+    the OCR workers (up to ``OCR_BATCH_MAX_IMAGES`` images per batch) to
+    keep them all busy. Every other input is a unit of its own. Images are
+    only probed from their headers, so planning does not delay OCR.
+
+    Args:
+        file_list: Paths to image files and/or PDF files.
+        suffixes: Lowercase extension of each path in ``file_list``.
+        max_dim: Maximum longest image side in pixels before OCR.
+        grayscale: Whether images are converted to grayscale before OCR.
+        workers: Number of concurrent OCR workers.
+
+    Returns:
+        Units in input order, each with its kind (``PDF_UNIT``, ``IMAGE_UNIT``
+        or ``DIRECT_IMAGE_UNIT``). Unsupported files are left out.
+    """
+    supported = [
+        (path, suffix)
+        for path, suffix in zip(file_list, suffixes, strict=True)
+        if suffix in SUPPORTED_EXTENSIONS
+    ]
+    units: list[tuple[list[Path], str]] = []
+    for kind, group in itertools.groupby(
+        supported,
+        key=lambda item: _unit_kind(item[0], item[1], max_dim, grayscale),
+    ):
+        paths = [path for path, _ in group]
+        if kind != DIRECT_IMAGE_UNIT:
+            units.extend(([path], kind) for path in paths)
+            continue
+        size = min(OCR_BATCH_MAX_IMAGES, math.ceil(len(paths) / workers))
+        units.extend(
+            (paths[start : start + size], kind) for start in range(0, len(paths), size)
+        )
+    return units
+
+
+def _iter_merge_sources(
+    units: list[tuple[list[Path], str]],
+    ocr_futures: Iterator[Future[bytes]],
+    pbar: tqdm,
+) -> Iterator[tuple[Path, bytes | None]]:
+    """Yield the inputs to merge, in order, waiting for OCR as needed.
+
+    Args:
+        units: Inputs grouped by ``_plan_merge_units``.
+        ocr_futures: OCR results for the image units, in order.
+        pbar: Progress bar, advanced after each unit has been merged.
+
+    Yields:
+        Tuples of the unit's first path and, for images, the OCR'd PDF bytes.
+        PDF inputs are yielded with ``None`` and are read from the path.
+    """
+    for unit, kind in units:
+        if kind == PDF_UNIT:
+            yield unit[0], None
+        else:
+            # Wait for the searchable PDF produced for these images
+            yield unit[0], next(ocr_futures).result()
+        pbar.update(len(unit))
+
+
+def _merge_with_pypdf(
+    sources: Iterable[tuple[Path, bytes | None]], output_pdf: Path
+) -> None:
+    """Merge PDFs with pypdf and write the result.
+
+    Args:
+        sources: Input paths with their OCR'd PDF bytes, if any.
+        output_pdf: Output PDF file path.
+    """
+    writer = PdfWriter()
+    # append() copies all pages in one pass, sharing resources referenced by
+    # several pages instead of re-walking them per page.
+    for path, pdf_bytes in sources:
+        if pdf_bytes is not None:
+            writer.append(io.BytesIO(pdf_bytes))
+            continue
+        # The same reader serves the text layer check and the merge, so each
+        # PDF is parsed once and released right after.
+        with PdfReader(path) as reader:
+            if _needs_password(reader):
+                _warn_password_protected(path)
+                continue
+            if not _reader_has_text_layer(reader, DEFAULT_TEXT_LAYER_THRESHOLD):
+                _warn_no_text_layer(path)
+            writer.append(reader)
+
+    # pypdf serializes object by object in many small writes; a large buffer
+    # turns them into few write syscalls.
+    with output_pdf.open("wb", buffering=OUTPUT_BUFFER_SIZE) as pdf_file:
+        writer.write(pdf_file)
+
+
+def _pikepdf_has_text_layer(pdf: Any, threshold: float) -> bool:
+    """Check if a PDF opened with pikepdf appears to have a text layer.
+
+    pikepdf cannot extract text, so pages that reference fonts (directly or
+    through form XObjects) are counted as pages with text. This is only used
+    to decide whether to warn about a missing text layer.
+
+    Args:
+        pdf: PDF opened with ``pikepdf.open``.
+        threshold: Minimum ratio of pages with text.
+
+    Returns:
+        True if the PDF appears to have a text layer, False otherwise.
+    """
+    return _pages_meet_threshold(pdf.pages, _pikepdf_page_may_have_text, threshold)
+
+
+def _pikepdf_page_may_have_text(page: Any) -> bool:
+    """Check whether a pikepdf page could contain text.
+
+    The pikepdf counterpart of ``_page_may_have_text``; pikepdf resolves
+    indirect objects itself.
+
+    Args:
+        page: Page of a PDF opened with ``pikepdf.open``.
+
+    Returns:
+        True if the page references fonts or form XObjects, False otherwise.
+    """
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    if "/Font" in resources:
+        return True
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+    return any(xobject.get("/Subtype") == "/Form" for xobject in xobjects.values())
+
+
+def _merge_with_pikepdf(
+    sources: Iterable[tuple[Path, bytes | None]], output_pdf: Path
+) -> None:
+    """Merge PDFs with pikepdf (QPDF) and write the result.
+
+    Args:
+        sources: Input paths with their OCR'd PDF bytes, if any.
+        output_pdf: Output PDF file path.
+    """
+    # Pages copied from another PDF refer to it until the output is saved,
+    # so every input stays open until then. Input files are read into memory
+    # rather than opened by path, which would hold one file descriptor each.
+    with contextlib.ExitStack() as stack, pikepdf.new() as merged:
+        for path, pdf_bytes in sources:
+            data = path.read_bytes() if pdf_bytes is None else pdf_bytes
+            try:
+                source = stack.enter_context(pikepdf.open(io.BytesIO(data)))
+            except pikepdf.PasswordError:
+                _warn_password_protected(path)
+                continue
+            if pdf_bytes is None and not _pikepdf_has_text_layer(
+                source, DEFAULT_TEXT_LAYER_THRESHOLD
+            ):
+                _warn_no_text_layer(path)
+            merged.pages.extend(source.pages)
+        merged.save(output_pdf)
+
+
+def _write_single_input(
+    path: Path, output_pdf: Path, language: str, max_dim: int, grayscale: bool
+) -> None:
+    """Write a lone input to the output without parsing and re-serializing it.
+
+    Tesseract's PDF output for an image, or an input PDF, already is the
+    complete result.
+
+    Args:
+        path: Path to the image or PDF file.
+        output_pdf: Output PDF file path.
+        language: Tesseract language codes for OCR on images (e.g., 'jpn+eng').
+        max_dim: Maximum longest image side in pixels before OCR.
+        grayscale: Convert the image to grayscale before OCR.
+    """
+    if path.suffix.lower() != PDF_EXTENSION:
+        pdf_bytes = image_to_pdf_bytes(
+            path, language, max_dim=max_dim, grayscale=grayscale
+        )
+        output_pdf.write_bytes(pdf_bytes)
+        return
+
+    if not has_text_layer(path):
+        _warn_no_text_layer(path)
+    # The input may already be the output, e.g. output.pdf from an earlier run
+    with contextlib.suppress(shutil.SameFileError):
+        shutil.copyfile(path, output_pdf)
 
 
 def assemble_pdf(
-    file_paths: Iterable[Path], output_pdf: Path, language: str = "jpn+eng"
+    file_paths: Iterable[Path],
+    output_pdf: Path,
+    language: str = "jpn+eng",
+    max_dim: int = DEFAULT_MAX_DIM,
+    grayscale: bool = False,
 ) -> None:
     """Combine images and PDFs into one searchable PDF in the given order.
 
-    For images, OCR is applied to create a searchable PDF.
+    For images, OCR is applied to create a searchable PDF. All images are
+    submitted for OCR up front (see ``OCR_CONCURRENCY``) and merged in the
+    original order, so merging overlaps with OCR of the remaining images.
+    Consecutive images that need no preprocessing are OCRed in batches.
     For PDFs without a text layer, a warning is printed and they are added
-    as-is (OCR on PDF pages would require pdf2image library).
+    as-is (OCR on PDF pages would require pdf2image library). Merging uses
+    pikepdf when it is installed and pypdf otherwise. A single input needs
+    no merging and is written to the output directly.
 
     Args:
         file_paths: Paths to image files and/or PDF files.
         output_pdf: Output PDF file path.
         language: Tesseract language codes for OCR on images (e.g., 'jpn+eng').
+        max_dim: Images whose longest side exceeds this many pixels are
+            downscaled before OCR.
+        grayscale: Convert images to grayscale before OCR.
     """
-    writer = PdfWriter()
     file_list = list(file_paths)
+    suffixes = [path.suffix.lower() for path in file_list]
+    output_pdf.parent.mkdir(parents=True, exist_ok=True)
 
-    with tqdm(total=len(file_list), desc="Converting to PDF", unit="file") as pbar:
-        for path in file_list:
-            if path.suffix.lower() == PDF_EXTENSION:
-                # Check if PDF needs OCR
-                if has_text_layer(path):
-                    # Add existing PDF pages directly (already has text layer)
-                    reader = PdfReader(path)
-                    for page in reader.pages:
-                        writer.add_page(page)
-                else:
-                    # PDF has no text layer - add with warning
-                    print(
-                        f"Warning: {path.name} has no text layer. Adding as-is "
-                        "without OCR."
-                    )
-                    reader = PdfReader(path)
-                    for page in reader.pages:
-                        writer.add_page(page)
-            elif path.suffix.lower() in IMAGE_EXTENSIONS:
-                # Convert image to searchable PDF
-                pdf_bytes = image_to_pdf_bytes(path, language)
-                reader = PdfReader(io.BytesIO(pdf_bytes))
-                for page in reader.pages:
-                    writer.add_page(page)
-            pbar.update(1)
+    if len(file_list) == 1 and suffixes[0] in SUPPORTED_EXTENSIONS:
+        _write_single_input(file_list[0], output_pdf, language, max_dim, grayscale)
+        return
 
-    output_pdf.parent.mkdir(parents=True, exist_ok=True)
-    with output_pdf.open("wb") as pdf_file:
-        writer.write(pdf_file)
+    image_count = sum(suffix in IMAGE_EXTENSIONS for suffix in suffixes)
+    workers = max(1, min(get_ocr_concurrency(), image_count))
+    units = _plan_merge_units(file_list, suffixes, max_dim, grayscale, workers)
+    image_units = [(unit, kind) for unit, kind in units if kind != PDF_UNIT]
+    convert = functools.partial(
+        image_to_pdf_bytes, language=language, max_dim=max_dim, grayscale=grayscale
+    )
+    convert_batch = functools.partial(images_to_pdf_bytes_batch, language=language)
+    # Planning already found these readable as-is; skip probing them again
+    convert_direct = functools.partial(_ocr_to_pdf_bytes, language=language)
+    merge = _merge_with_pypdf if pikepdf is None else _merge_with_pikepdf
+
+    # OCR runs in the executor; the PDF libraries are not thread-safe, so
+    # merging stays in this thread and consumes OCR results in input order.
+    with _create_ocr_executor(workers) as executor:
+        ocr_futures = iter(
+            [
+                executor.submit(convert_batch, unit)
+                if len(unit) > 1
+                else executor.submit(
+                    convert_direct if kind == DIRECT_IMAGE_UNIT else convert, unit[0]
+                )
+                for unit, kind in image_units
+            ]
+        )
+        try:
+            with tqdm(
+                total=sum(len(unit) for unit, _ in units),
+                desc="Converting to PDF",
+                unit="file",
+            ) as pbar:
+                merge(_iter_merge_sources(units, ocr_futures, pbar), output_pdf)
+        except BaseException:
+            # Don't OCR the remaining images if merging failed
+            executor.shutdown(cancel_futures=True)
+            raise
+
+
+def _positive_int(value: str) -> int:
+    """Parse a positive integer CLI argument.
+
+    Args:
+        value: Raw argument string.
+
+    Returns:
+        The parsed integer.
+
+    Raises:
+        argparse.ArgumentTypeError: If the value is not a positive integer.
+    """
+    try:
+        number = int(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(
+            f"Expected a positive integer, got: {value}"
+        ) from e
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"Expected a positive integer, got: {value}")
+    return number
 
 
 def parse_args() -> argparse.Namespace:
@@ -202,6 +1097,23 @@ def parse_args() -> argparse.Namespace:
             "mixed documents."
         ),
     )
+    parser.add_argument(
+        "--max-dim",
+        type=_positive_int,
+        default=DEFAULT_MAX_DIM,
+        help=(
+            "Downscale images whose longest side exceeds this many pixels "
+            f"before OCR. Defaults to {DEFAULT_MAX_DIM}."
+        ),
+    )
+    parser.add_argument(
+        "--grayscale",
+        action="store_true",
+        help=(
+            "Convert images to grayscale (1-bit for black and white scans) "
+            "before OCR. Faster, but image pages in the output lose color."
+        ),
+    )
     return parser.parse_args()
 
 
@@ -212,8 +1124,22 @@ def run_cli() -> None:
     if not files:
         raise SystemExit("No supported files found in the specified folder.")
 
+    if not has_libjpeg_turbo() and any(
+        path.suffix.lower() in JPEG_EXTENSIONS for path in files
+    ):
+        print(
+            "Warning: Pillow is not built with libjpeg-turbo. JPEG decoding "
+            "will be slower; see the README for how to rebuild Pillow."
+        )
+
     output_pdf = args.output or args.folder / "output.pdf"
-    assemble_pdf(files, output_pdf, language=args.lang)
+    assemble_pdf(
+        files,
+        output_pdf,
+        language=args.lang,
+        max_dim=args.max_dim,
+        grayscale=args.grayscale,
+    )
     print(f"Saved searchable PDF to {output_pdf}")
 
 
@@ -1,20 +1,74 @@
 """Tests for scan_to_pdf.main module."""
 
+import io
+import os
+from collections.abc import Callable, Iterator
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
-from PIL import Image
+from PIL import Image, ImageFile
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
 
 from scan_to_pdf.main import (
+    assemble_pdf,
     collect_files,
     get_creation_timestamp,
+    get_ocr_backend,
+    get_ocr_concurrency,
+    has_libjpeg_turbo,
     has_text_layer,
     image_to_pdf_bytes,
+    images_to_pdf_bytes_batch,
 )
 
 
+def capture_ocr_input(images: list[Image.Image]) -> Callable[..., bytes]:
+    """Create an OCR stub that records the image file it is given."""
+
+    def fake_ocr(image_file: str, **_: str) -> bytes:
+        with Image.open(image_file) as img:
+            img.load()
+            images.append(img)
+        return b"%PDF-1.4\ntest"
+
+    return fake_ocr
+
+
+def make_text_pdf_bytes(text: str) -> bytes:
+    """Create PDF bytes with one page showing ``text`` in Helvetica."""
+    writer = PdfWriter()
+    page = writer.add_blank_page(width=200, height=100)
+    font = DictionaryObject(
+        {
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/Helvetica"),
+        }
+    )
+    page[NameObject("/Resources")] = DictionaryObject(
+        {NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})}
+    )
+    content = DecodedStreamObject()
+    content.set_data(f"BT /F1 12 Tf 10 50 Td ({text}) Tj ET".encode())
+    page.replace_contents(content)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def make_blank_pdf_bytes(width: float, pages: int = 1) -> bytes:
+    """Create PDF bytes with blank pages of the given width."""
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=width, height=100)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
 class TestGetCreationTimestamp:
     """Tests for get_creation_timestamp function."""
 
@@ -85,12 +139,56 @@ class TestCollectFiles:
             assert len(collected) == 3
             assert all(f.suffix == ".png" for f in collected)
 
+    def test_collect_files_skips_unsupported_entries(self) -> None:
+        """Test that unsupported files and directories are skipped."""
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            (tmp_path / "scan.PNG").write_bytes(b"dummy")
+            (tmp_path / "notes.txt").write_text("notes")
+            (tmp_path / "README").write_text("readme")
+            (tmp_path / "folder.pdf").mkdir()
+
+            files = collect_files(tmp_path)
+            assert files == [tmp_path / "scan.PNG"]
+
+    def test_collect_files_orders_by_timestamp(self) -> None:
+        """Test that files are ordered by timestamp, not by name."""
+        if hasattr(os.stat_result, "st_birthtime"):
+            pytest.skip("creation time cannot be set on this platform")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            names = ["c.png", "a.pdf", "b.jpg"]
+            for offset, name in enumerate(names):
+                path = tmp_path / name
+                path.write_bytes(b"dummy")
+                os.utime(path, (1_000_000 + offset, 1_000_000 + offset))
+
+            files = collect_files(tmp_path)
+            assert [f.name for f in files] == names
+
+    def test_collect_files_orders_large_folder_by_timestamp(self) -> None:
+        """Test ordering when the folder is large enough to stat in parallel."""
+        if hasattr(os.stat_result, "st_birthtime"):
+            pytest.skip("creation time cannot be set on this platform")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            # Names sort in the opposite order of their timestamps
+            names = [f"scan{index:03d}.png" for index in range(100, 0, -1)]
+            for offset, name in enumerate(names):
+                path = tmp_path / name
+                path.write_bytes(b"dummy")
+                os.utime(path, (1_000_000 + offset, 1_000_000 + offset))
+
+            files = collect_files(tmp_path)
+            assert [f.name for f in files] == names
+
 
 class TestImageToPdfBytes:
     """Tests for image_to_pdf_bytes function."""
 
-    def test_image_to_pdf_bytes_png(self) -> None:
+    def test_image_to_pdf_bytes_png(self, monkeypatch: pytest.MonkeyPatch) -> None:
         """Test converting PNG image to PDF bytes."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
         with TemporaryDirectory() as tmpdir:
             tmp_path = Path(tmpdir)
 
@@ -107,8 +205,11 @@ class TestImageToPdfBytes:
                 assert isinstance(pdf_bytes, bytes)
                 assert pdf_bytes.startswith(b"%PDF")
 
-    def test_image_to_pdf_bytes_with_string_return(self) -> None:
+    def test_image_to_pdf_bytes_with_string_return(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
         """Test that string returns from OCR are encoded to bytes."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
         with TemporaryDirectory() as tmpdir:
             tmp_path = Path(tmpdir)
 
@@ -125,6 +226,243 @@ class TestImageToPdfBytes:
                 assert isinstance(pdf_bytes, bytes)
                 assert pdf_bytes == b"%PDF-1.4\ntest"
 
+    def test_image_to_pdf_bytes_tesserocr_backend(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the tesserocr backend reads the PDF rendered by the API."""
+        monkeypatch.setenv("OCR_BACKEND", "tesserocr")
+
+        def process_pages(output_base: str, filename: str) -> bool:
+            assert Path(filename).exists()
+            Path(f"{output_base}.pdf").write_bytes(b"%PDF-1.5\ntesserocr")
+            return True
+
+        with TemporaryDirectory() as tmpdir:
+            img_path = Path(tmpdir) / "test.png"
+            Image.new("RGB", (100, 100), color="green").save(img_path)
+
+            with (
+                patch("scan_to_pdf.main.tesserocr"),
+                patch("scan_to_pdf.main._get_api") as mock_get_api,
+                patch("scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr") as mock_ocr,
+            ):
+                mock_get_api.return_value.ProcessPages.side_effect = process_pages
+
+                pdf_bytes = image_to_pdf_bytes(img_path, "eng")
+
+                assert pdf_bytes == b"%PDF-1.5\ntesserocr"
+                mock_get_api.assert_called_once_with("eng")
+                mock_ocr.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("filename", "size", "expected"),
+        [
+            ("large.png", (8000, 4000), (1000, 500)),
+            ("small.webp", (600, 300), (600, 300)),
+        ],
+    )
+    def test_image_to_pdf_bytes_downscales_to_max_dim(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        filename: str,
+        size: tuple[int, int],
+        expected: tuple[int, int],
+    ) -> None:
+        """Test that only images larger than max_dim are downscaled."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            img_path = Path(tmpdir) / filename
+            Image.new("RGB", size, color="white").save(img_path)
+
+            ocr_inputs: list[Image.Image] = []
+            with patch(
+                "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                side_effect=capture_ocr_input(ocr_inputs),
+            ):
+                image_to_pdf_bytes(img_path, "eng", max_dim=1000)
+
+            assert ocr_inputs[0].size == expected
+
+    def test_image_to_pdf_bytes_downscaled_jpeg_keeps_page_size(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that DPI is scaled with the image so the page size is kept."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            img_path = Path(tmpdir) / "large.jpg"
+            Image.new("RGB", (8000, 4000), color="white").save(img_path, dpi=(400, 400))
+
+            ocr_inputs: list[Image.Image] = []
+            with patch(
+                "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                side_effect=capture_ocr_input(ocr_inputs),
+            ):
+                image_to_pdf_bytes(img_path, "eng", max_dim=1000)
+
+            assert ocr_inputs[0].size == (1000, 500)
+            # PNG stores the resolution in whole pixels per meter
+            assert ocr_inputs[0].info["dpi"] == pytest.approx((50, 50), rel=1e-3)
+
+    @pytest.mark.parametrize(
+        ("color", "expected_mode", "expected_format"),
+        [((200, 120, 40), "L", "PNG"), ((255, 255, 255), "1", "TIFF")],
+    )
+    def test_image_to_pdf_bytes_grayscale(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        color: tuple[int, int, int],
+        expected_mode: str,
+        expected_format: str,
+    ) -> None:
+        """Test that grayscale mode yields L, or 1-bit for black and white."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            img_path = Path(tmpdir) / "color.png"
+            Image.new("RGB", (100, 50), color=color).save(img_path)
+
+            ocr_inputs: list[Image.Image] = []
+            with patch(
+                "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                side_effect=capture_ocr_input(ocr_inputs),
+            ):
+                image_to_pdf_bytes(img_path, "eng", grayscale=True)
+
+            assert ocr_inputs[0].mode == expected_mode
+            # Tesseract would embed 8-bit TIFF input as lossy JPEG
+            assert ocr_inputs[0].format == expected_format
+
+    @pytest.mark.parametrize("suffix", [".jpg", ".png"])
+    def test_image_to_pdf_bytes_passes_upright_image_by_path(
+        self, monkeypatch: pytest.MonkeyPatch, suffix: str
+    ) -> None:
+        """Test that upright native images are handed to Tesseract by path."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            img_path = Path(tmpdir) / f"upright{suffix}"
+            Image.new("RGB", (100, 50), color="white").save(img_path)
+
+            with (
+                patch("scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr") as mock_ocr,
+                patch.object(ImageFile.ImageFile, "load") as mock_load,
+            ):
+                mock_ocr.return_value = b"%PDF-1.4\ntest"
+
+                image_to_pdf_bytes(img_path, "eng")
+
+                assert mock_ocr.call_args.args[0] == str(img_path)
+                mock_load.assert_not_called()
+
+    @pytest.mark.parametrize(
+        ("suffix", "mode", "by_path"),
+        [(".tif", "RGB", False), (".bmp", "RGB", False), (".tif", "1", True)],
+    )
+    def test_image_to_pdf_bytes_passes_only_lossless_formats_by_path(
+        self, monkeypatch: pytest.MonkeyPatch, suffix: str, mode: str, by_path: bool
+    ) -> None:
+        """Test that images Tesseract would embed as JPEG go through Pillow."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            img_path = Path(tmpdir) / f"upright{suffix}"
+            Image.new(mode, (100, 50), color="white").save(img_path)
+
+            ocr_inputs: list[Image.Image] = []
+            with patch(
+                "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                side_effect=capture_ocr_input(ocr_inputs),
+            ) as mock_ocr:
+                image_to_pdf_bytes(img_path, "eng")
+
+            assert (mock_ocr.call_args.args[0] == str(img_path)) is by_path
+            if not by_path:
+                assert ocr_inputs[0].format == "PNG"
+
+    @pytest.mark.parametrize("suffix", [".jpg", ".png"])
+    def test_image_to_pdf_bytes_rotates_exif_oriented_image(
+        self, monkeypatch: pytest.MonkeyPatch, suffix: str
+    ) -> None:
+        """Test that images with an EXIF rotation are transposed with Pillow."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            img_path = Path(tmpdir) / f"rotated{suffix}"
+            exif = Image.Exif()
+            exif[0x0112] = 6  # Rotate 90 degrees clockwise
+            Image.new("RGB", (100, 50), color="white").save(img_path, exif=exif)
+
+            ocr_inputs: list[Image.Image] = []
+            with patch(
+                "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                side_effect=capture_ocr_input(ocr_inputs),
+            ):
+                image_to_pdf_bytes(img_path, "eng")
+
+            assert ocr_inputs[0].size == (50, 100)
+            assert ocr_inputs[0].format == "PNG"
+
+
+class TestImagesToPdfBytesBatch:
+    """Tests for images_to_pdf_bytes_batch function."""
+
+    def test_images_to_pdf_bytes_batch_lists_images_in_order(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that one Tesseract run receives a list file of all images."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        listed: list[str] = []
+
+        def fake_ocr(list_file: str, **_: str) -> bytes:
+            listed.extend(Path(list_file).read_text(encoding="utf-8").splitlines())
+            return b"%PDF-1.4\nbatch"
+
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            images = [tmp_path / "b.png", tmp_path / "a.jpg"]
+            for image in images:
+                Image.new("RGB", (10, 10)).save(image)
+
+            with patch(
+                "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                side_effect=fake_ocr,
+            ) as mock_ocr:
+                pdf_bytes = images_to_pdf_bytes_batch(images, "eng")
+
+            assert pdf_bytes == b"%PDF-1.4\nbatch"
+            mock_ocr.assert_called_once()
+            assert listed == [str(image.resolve()) for image in images]
+
+
+class TestGetOcrBackend:
+    """Tests for get_ocr_backend function."""
+
+    def test_get_ocr_backend_from_env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that OCR_BACKEND selects the pytesseract fallback."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        assert get_ocr_backend() == "pytesseract"
+
+    def test_get_ocr_backend_defaults_to_pytesseract_without_tesserocr(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that pytesseract is used when tesserocr is not installed."""
+        monkeypatch.delenv("OCR_BACKEND", raising=False)
+        with patch("scan_to_pdf.main.tesserocr", None):
+            assert get_ocr_backend() == "pytesseract"
+
+    def test_get_ocr_backend_tesserocr_missing_raises(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that requesting tesserocr without it installed raises."""
+        monkeypatch.setenv("OCR_BACKEND", "tesserocr")
+        with patch("scan_to_pdf.main.tesserocr", None):
+            with pytest.raises(ValueError):
+                get_ocr_backend()
+
+    def test_get_ocr_backend_unknown_raises(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an unknown backend name raises ValueError."""
+        monkeypatch.setenv("OCR_BACKEND", "easyocr")
+        with pytest.raises(ValueError):
+            get_ocr_backend()
+
 
 class TestHasTextLayer:
     """Tests for has_text_layer function."""
@@ -142,8 +480,396 @@ class TestHasTextLayer:
             pdf_path.write_bytes(b"")  # Create empty file
 
             with patch("scan_to_pdf.main.PdfReader") as mock_reader:
-                mock_instance = mock_reader.return_value
+                mock_instance = mock_reader.return_value.__enter__.return_value
                 mock_instance.pages = []
 
                 result = has_text_layer(pdf_path, threshold=0.1)
                 assert result is False
+
+    def test_has_text_layer_password_protected_pdf(self) -> None:
+        """Test that a PDF needing a password is treated as having no text."""
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        writer.encrypt(user_password="secret", owner_password="owner")
+        with TemporaryDirectory() as tmpdir:
+            pdf_path = Path(tmpdir) / "locked.pdf"
+            with pdf_path.open("wb") as pdf_file:
+                writer.write(pdf_file)
+
+            with patch.object(PageObject, "extract_text") as mock_extract:
+                assert has_text_layer(pdf_path) is False
+
+            mock_extract.assert_not_called()
+
+    def test_has_text_layer_stops_after_first_page_with_text(self) -> None:
+        """Test that later pages are not extracted once the threshold is met."""
+        font_resources = DictionaryObject({NameObject("/Font"): DictionaryObject()})
+        pages = []
+        for _ in range(10):
+            page = MagicMock()
+            page.get.return_value = font_resources
+            page.extract_text.return_value = "text"
+            pages.append(page)
+
+        with TemporaryDirectory() as tmpdir:
+            pdf_path = Path(tmpdir) / "text.pdf"
+            pdf_path.write_bytes(b"")
+
+            with patch("scan_to_pdf.main.PdfReader") as mock_reader:
+                mock_reader.return_value.__enter__.return_value.pages = pages
+
+                assert has_text_layer(pdf_path, threshold=0.1) is True
+
+        pages[0].extract_text.assert_called_once()
+        assert all(not page.extract_text.called for page in pages[1:])
+
+    def test_has_text_layer_skips_pages_without_fonts(self) -> None:
+        """Test that image-only pages are not text-extracted."""
+        with TemporaryDirectory() as tmpdir:
+            pdf_path = Path(tmpdir) / "scan.pdf"
+            pdf_path.write_bytes(make_blank_pdf_bytes(100, pages=3))
+
+            with patch.object(PageObject, "extract_text") as mock_extract:
+                assert has_text_layer(pdf_path, threshold=0.1) is False
+
+            mock_extract.assert_not_called()
+
+    def test_has_text_layer_compares_page_ratio(self) -> None:
+        """Test that the threshold is compared as a ratio of pages."""
+        font_resources = DictionaryObject({NameObject("/Font"): DictionaryObject()})
+        pages = []
+        for index in range(100):
+            page = MagicMock()
+            page.get.return_value = font_resources
+            page.extract_text.return_value = "text" if index < 7 else ""
+            pages.append(page)
+
+        with TemporaryDirectory() as tmpdir:
+            pdf_path = Path(tmpdir) / "text.pdf"
+            pdf_path.write_bytes(b"")
+
+            with patch("scan_to_pdf.main.PdfReader") as mock_reader:
+                mock_reader.return_value.__enter__.return_value.pages = pages
+
+                # 100 * 0.07 is slightly above 7 in floating point
+                assert has_text_layer(pdf_path, threshold=0.07) is True
+
+
+class TestHasLibjpegTurbo:
+    """Tests for has_libjpeg_turbo function."""
+
+    def test_has_libjpeg_turbo_with_version(self) -> None:
+        """Test that a reported libjpeg-turbo version returns True."""
+        with patch("scan_to_pdf.main.features.version", return_value="3.0.0"):
+            assert has_libjpeg_turbo() is True
+
+    def test_has_libjpeg_turbo_without_version(self) -> None:
+        """Test that a missing libjpeg-turbo feature returns False."""
+        with patch("scan_to_pdf.main.features.version", return_value=None):
+            assert has_libjpeg_turbo() is False
+
+
+class TestGetOcrConcurrency:
+    """Tests for get_ocr_concurrency function."""
+
+    def test_get_ocr_concurrency_from_env(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that OCR_CONCURRENCY overrides the default."""
+        monkeypatch.setenv("OCR_CONCURRENCY", "3")
+        assert get_ocr_concurrency() == 3
+
+    def test_get_ocr_concurrency_defaults_to_cpu_count(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the CPU count is used when OCR_CONCURRENCY is unset."""
+        monkeypatch.delenv("OCR_CONCURRENCY", raising=False)
+        with patch("scan_to_pdf.main.os.cpu_count", return_value=6):
+            assert get_ocr_concurrency() == 6
+
+    @pytest.mark.parametrize("value", ["0", "-2", "many"])
+    def test_get_ocr_concurrency_invalid_raises(
+        self, monkeypatch: pytest.MonkeyPatch, value: str
+    ) -> None:
+        """Test that non-positive or non-integer values raise ValueError."""
+        monkeypatch.setenv("OCR_CONCURRENCY", value)
+        with pytest.raises(ValueError):
+            get_ocr_concurrency()
+
+
+class TestAssemblePdf:
+    """Tests for assemble_pdf function."""
+
+    @pytest.fixture(params=["pypdf", "pikepdf"])
+    def merge_backend(self, request: pytest.FixtureRequest) -> Iterator[str]:
+        """Run a test with each PDF merge backend."""
+        if request.param == "pikepdf":
+            pytest.importorskip("pikepdf")
+            yield request.param
+        else:
+            with patch("scan_to_pdf.main.pikepdf", None):
+                yield request.param
+
+    def test_assemble_pdf_preserves_input_order(
+        self, monkeypatch: pytest.MonkeyPatch, merge_backend: str
+    ) -> None:
+        """Test that images and PDFs are merged in the given order."""
+        monkeypatch.setenv("OCR_CONCURRENCY", "2")
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            first = tmp_path / "first.png"
+            middle = tmp_path / "middle.pdf"
+            last = tmp_path / "last.jpg"
+            Image.new("RGB", (10, 10)).save(first)
+            middle.write_bytes(make_blank_pdf_bytes(200, pages=2))
+            Image.new("RGB", (10, 10)).save(last)
+            widths = {str(first): 100, str(last): 300}
+            output = tmp_path / "out" / "output.pdf"
+
+            with patch(
+                "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                side_effect=lambda path, **_: make_blank_pdf_bytes(widths[path]),
+            ):
+                assemble_pdf([first, middle, last], output, language="eng")
+
+            reader = PdfReader(output)
+            assert [float(page.mediabox.width) for page in reader.pages] == [
+                100,
+                200,
+                200,
+                300,
+            ]
+
+    def test_assemble_pdf_batches_consecutive_images(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that runs of plain images are split into batches per worker."""
+        monkeypatch.setenv("OCR_CONCURRENCY", "2")
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            images = [tmp_path / f"page{index}.png" for index in range(4)]
+            for image in images:
+                Image.new("RGB", (10, 10)).save(image)
+            rotated = tmp_path / "rotated.jpg"
+            exif = Image.Exif()
+            exif[0x0112] = 6
+            Image.new("RGB", (10, 10)).save(rotated, exif=exif)
+            output = tmp_path / "output.pdf"
+
+            with (
+                patch(
+                    "scan_to_pdf.main.images_to_pdf_bytes_batch",
+                    side_effect=lambda paths, **_: make_blank_pdf_bytes(
+                        100, pages=len(paths)
+                    ),
+                ) as mock_batch,
+                patch(
+                    "scan_to_pdf.main.image_to_pdf_bytes",
+                    return_value=make_blank_pdf_bytes(300),
+                ) as mock_single,
+            ):
+                assemble_pdf([*images, rotated], output, language="eng")
+
+            assert [call.args[0] for call in mock_batch.call_args_list] == [
+                images[:2],
+                images[2:],
+            ]
+            mock_single.assert_called_once()
+            assert mock_single.call_args.args[0] == rotated
+            reader = PdfReader(output)
+            assert [float(page.mediabox.width) for page in reader.pages] == [
+                100,
+                100,
+                100,
+                100,
+                300,
+            ]
+
+    def test_assemble_pdf_probes_upright_images_once_without_decoding(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that planning reads image headers only and is not repeated."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            first = tmp_path / "first.png"
+            middle = tmp_path / "middle.pdf"
+            last = tmp_path / "last.png"
+            Image.new("RGB", (10, 10)).save(first)
+            middle.write_bytes(make_blank_pdf_bytes(200))
+            Image.new("RGB", (10, 10)).save(last)
+            output = tmp_path / "output.pdf"
+
+            with (
+                patch(
+                    "scan_to_pdf.main.pytesseract.image_to_pdf_or_hocr",
+                    return_value=make_blank_pdf_bytes(100),
+                ) as mock_ocr,
+                patch("scan_to_pdf.main.Image.open", wraps=Image.open) as mock_open,
+                patch.object(ImageFile.ImageFile, "load") as mock_load,
+                patch("scan_to_pdf.main._warn_no_text_layer"),
+            ):
+                assemble_pdf([first, middle, last], output, language="eng")
+
+            assert sorted(call.args[0] for call in mock_ocr.call_args_list) == [
+                str(first),
+                str(last),
+            ]
+            assert mock_open.call_count == 2
+            mock_load.assert_not_called()
+
+    def test_assemble_pdf_warns_about_pdf_without_text_layer(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        merge_backend: str,
+    ) -> None:
+        """Test that image-only PDFs are merged with a warning."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            scans = [tmp_path / "scan1.pdf", tmp_path / "scan2.pdf"]
+            for scan in scans:
+                scan.write_bytes(make_blank_pdf_bytes(150))
+            output = tmp_path / "output.pdf"
+
+            assemble_pdf(scans, output, language="eng")
+
+            out = capsys.readouterr().out
+            assert "scan1.pdf has no text layer" in out
+            assert "scan2.pdf has no text layer" in out
+            assert len(PdfReader(output).pages) == 2
+
+    def test_assemble_pdf_does_not_warn_about_pdf_with_text_layer(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        merge_backend: str,
+    ) -> None:
+        """Test that both merge backends recognize a PDF with text."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            texts = [tmp_path / "text1.pdf", tmp_path / "text2.pdf"]
+            for text in texts:
+                text.write_bytes(make_text_pdf_bytes("Hello"))
+            output = tmp_path / "output.pdf"
+
+            assemble_pdf(texts, output, language="eng")
+
+            assert "no text layer" not in capsys.readouterr().out
+            assert len(PdfReader(output).pages) == 2
+
+    def test_assemble_pdf_skips_password_protected_pdf(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        merge_backend: str,
+    ) -> None:
+        """Test that PDFs needing a password are left out with a warning."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        writer = PdfWriter()
+        writer.add_blank_page(width=100, height=100)
+        writer.encrypt(user_password="secret", owner_password="owner")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            text = tmp_path / "text.pdf"
+            text.write_bytes(make_text_pdf_bytes("Hello"))
+            locked = tmp_path / "locked.pdf"
+            with locked.open("wb") as pdf_file:
+                writer.write(pdf_file)
+            output = tmp_path / "output.pdf"
+
+            assemble_pdf([text, locked], output, language="eng")
+
+            out = capsys.readouterr().out
+            assert "locked.pdf is password-protected. Skipping." in out
+            assert "no text layer" not in out
+            assert len(PdfReader(output).pages) == 1
+
+    def test_assemble_pdf_many_pdfs_within_fd_limit(
+        self, monkeypatch: pytest.MonkeyPatch, merge_backend: str
+    ) -> None:
+        """Test that merging does not keep a file descriptor per input open."""
+        resource = pytest.importorskip("resource")
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        fd_limit = 128
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            pdf_bytes = make_blank_pdf_bytes(100)
+            pdfs = [tmp_path / f"{index:03d}.pdf" for index in range(fd_limit * 2)]
+            for pdf in pdfs:
+                pdf.write_bytes(pdf_bytes)
+            output = tmp_path / "output.pdf"
+
+            resource.setrlimit(resource.RLIMIT_NOFILE, (fd_limit, hard))
+            try:
+                with patch("scan_to_pdf.main._warn_no_text_layer"):
+                    assemble_pdf(pdfs, output, language="eng")
+            finally:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+
+            assert len(PdfReader(output).pages) == len(pdfs)
+
+    def test_assemble_pdf_single_image_writes_ocr_output(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a single image's OCR output is written unchanged."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        pdf_bytes = make_blank_pdf_bytes(120)
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            image = tmp_path / "receipt.jpg"
+            Image.new("RGB", (10, 10)).save(image)
+            output = tmp_path / "out" / "output.pdf"
+
+            with patch("scan_to_pdf.main.image_to_pdf_bytes", return_value=pdf_bytes):
+                assemble_pdf([image], output, language="eng")
+
+            assert output.read_bytes() == pdf_bytes
+
+    def test_assemble_pdf_single_pdf_is_copied(self) -> None:
+        """Test that a single PDF is copied byte for byte."""
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            source = tmp_path / "document.pdf"
+            source.write_bytes(make_blank_pdf_bytes(80, pages=3))
+            output = tmp_path / "output.pdf"
+
+            assemble_pdf([source], output, language="eng")
+
+            assert output.read_bytes() == source.read_bytes()
+
+    def test_assemble_pdf_single_pdf_already_output(self) -> None:
+        """Test that an input that is the output itself is left in place."""
+        with TemporaryDirectory() as tmpdir:
+            output = Path(tmpdir) / "output.pdf"
+            content = make_blank_pdf_bytes(80)
+            output.write_bytes(content)
+
+            assemble_pdf([output], output, language="eng")
+
+            assert output.read_bytes() == content
+
+    def test_assemble_pdf_propagates_ocr_errors(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an OCR failure aborts without writing the output."""
+        monkeypatch.setenv("OCR_BACKEND", "pytesseract")
+        with TemporaryDirectory() as tmpdir:
+            tmp_path = Path(tmpdir)
+            image = tmp_path / "broken.png"
+            Image.new("RGB", (10, 10)).save(image)
+            output = tmp_path / "output.pdf"
+
+            with patch(
+                "scan_to_pdf.main.image_to_pdf_bytes",
+                side_effect=RuntimeError("tesseract failed"),
+            ):
+                with pytest.raises(RuntimeError, match="tesseract failed"):
+                    assemble_pdf([image], output, language="eng")
+
+            assert not output.exists()